@@ -1,6 +1,9 @@
+import os
+import sys
+import subprocess
 import numpy as np
 import pandas as pd
-from numba import njit
+from numba import njit, farray, types, config
 import pytest
 from datetime import datetime
 
@@ -2477,7 +2480,111 @@ class TestIndexing:
 
 # ############# combine_fns.py ############# #
 
+def run_with_parallel_threshold(code, parallel_threshold):
+    # parallel_threshold is read at import time, thus run in a fresh interpreter
+    env = dict(os.environ)
+    env['VBT_PARALLEL_THRESHOLD'] = parallel_threshold
+    pkg_path = os.path.dirname(os.path.dirname(os.path.abspath(vbt.__file__)))
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [pkg_path, env.get('PYTHONPATH')]))
+    return subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True)
+
+
 class TestCombineFns:
+    def test_can_parallelize(self, monkeypatch):
+        arr_args = types.Tuple((types.float64[:, :], types.int64[:]))
+        tuple_args = types.Tuple((types.float64[:, :], types.UniTuple(types.int64, 3)))
+        monkeypatch.setattr(combine_fns, 'parallel_threshold', None)
+        assert not combine_fns.can_parallelize(arr_args)
+        monkeypatch.setattr(combine_fns, 'parallel_threshold', 2)
+        assert combine_fns.can_parallelize(arr_args)
+        assert not combine_fns.can_parallelize(tuple_args)
+
+    def test_parallel_threshold_none(self):
+        if combine_fns.parallel_threshold is None:
+            assert combine_fns.apply_and_concat_none_nb is combine_fns.apply_and_concat_none_seq_nb
+            assert combine_fns.apply_and_concat_one_nb is combine_fns.apply_and_concat_one_seq_nb
+            assert combine_fns.apply_and_concat_multiple_nb is combine_fns.apply_and_concat_multiple_seq_nb
+
+    @pytest.mark.skipif(config.DISABLE_JIT, reason="Dispatching is resolved at compile time")
+    def test_parallel_dispatch(self):
+        code = """
+import numpy as np
+from numba import njit
+from vectorbt.base import combine_fns
+
+assert combine_fns.parallel_threshold == 2
+assert combine_fns.apply_and_concat_one_nb is not combine_fns.apply_and_concat_one_seq_nb
+
+@njit
+def apply_func_nb(i, x, a):
+    return x + a[i]
+
+@njit
+def apply_multiple_func_nb(i, x, a):
+    return (x, x + a[i])
+
+@njit
+def apply_none_func_nb(i, out, a):
+    out[:, i] = a[i]
+
+x = np.array([[1, 2], [3, 4]])
+target = np.array([[11, 12, 21, 22, 31, 32], [13, 14, 23, 24, 33, 34]])
+
+# tuples cannot be passed to a parallel loop -> sequential version only
+np.testing.assert_array_equal(combine_fns.apply_and_concat_one_nb(3, apply_func_nb, x, (10, 20, 30)), target)
+assert len(combine_fns.apply_and_concat_one_seq_nb.signatures) == 1
+assert len(combine_fns.apply_and_concat_one_par_nb.signatures) == 0
+
+# arrays -> parallel version above the threshold
+a = np.array([10, 20, 30])
+np.testing.assert_array_equal(combine_fns.apply_and_concat_one_nb(3, apply_func_nb, x, a), target)
+np.testing.assert_array_equal(combine_fns.apply_and_concat_one_nb(1, apply_func_nb, x, a), target[:, :2])
+assert len(combine_fns.apply_and_concat_one_par_nb.signatures) == 1
+
+out_a, out_b = combine_fns.apply_and_concat_multiple_nb(3, apply_multiple_func_nb, x, a)
+np.testing.assert_array_equal(out_a, np.tile(x, 3))
+np.testing.assert_array_equal(out_b, target)
+assert len(combine_fns.apply_and_concat_multiple_par_nb.signatures) == 1
+
+out = np.empty((2, 3), dtype=np.int_)
+combine_fns.apply_and_concat_none_nb(3, apply_none_func_nb, out, a)
+np.testing.assert_array_equal(out, np.array([[10, 20, 30], [10, 20, 30]]))
+assert len(combine_fns.apply_and_concat_none_par_nb.signatures) == 1
+"""
+        result = run_with_parallel_threshold(code, '2')
+        assert result.returncode == 0, result.stderr
+        result = run_with_parallel_threshold("import vectorbt", 'abc')
+        assert result.returncode != 0
+        assert "VBT_PARALLEL_THRESHOLD" in result.stderr
+        result = run_with_parallel_threshold(
+            "from vectorbt.base import combine_fns; assert combine_fns.parallel_threshold is None", '')
+        assert result.returncode == 0, result.stderr
+
+    def test_apply_and_concat_none(self):
+        def apply_func(i, out, a):
+            out[:, i] = a[i]
+
+        @njit(nogil=True)
+        def apply_func_nb(i, out, a):
+            out[:, i] = a[i]
+
+        target = np.array([
+            [10, 20, 30],
+            [10, 20, 30]
+        ])
+        out = np.empty((2, 3))
+        combine_fns.apply_and_concat_none(3, apply_func, out, [10, 20, 30])
+        np.testing.assert_array_equal(out, target)
+        out = np.empty((2, 3))
+        combine_fns.apply_and_concat_none(3, apply_func, out, [10, 20, 30], n_threads=2)
+        np.testing.assert_array_equal(out, target)
+        out = np.empty((2, 3))
+        combine_fns.apply_and_concat_none(3, apply_func_nb, out, np.array([10, 20, 30]), n_threads=2)
+        np.testing.assert_array_equal(out, target)
+        out = np.empty((2, 3))
+        combine_fns.apply_and_concat_none_nb(3, apply_func_nb, out, np.array([10, 20, 30]))
+        np.testing.assert_array_equal(out, target)
+
     def test_apply_and_concat_one(self):
         def apply_func(i, x, a):
             return x + a[i]
@@ -2500,6 +2607,10 @@ class TestCombineFns:
             combine_fns.apply_and_concat_one_nb(3, apply_func_nb, sr2.values, (10, 20, 30)),
             target
         )
+        np.testing.assert_array_equal(
+            combine_fns.apply_and_concat_one_par_nb(3, apply_func_nb, sr2.values, np.array([10, 20, 30])),
+            target
+        )
         # 2d
         target2 = np.array([
             [11, 12, 13, 21, 22, 23, 31, 32, 33],
@@ -2514,6 +2625,78 @@ class TestCombineFns:
             combine_fns.apply_and_concat_one_nb(3, apply_func_nb, df4.values, (10, 20, 30)),
             target2
         )
+        np.testing.assert_array_equal(
+            combine_fns.apply_and_concat_one_par_nb(3, apply_func_nb, df4.values, np.array([10, 20, 30])),
+            target2
+        )
+        if ray_available:
+            np.testing.assert_array_equal(
+                combine_fns.apply_and_concat_one_ray(3, apply_func, df4.values, [10, 20, 30], n_chunks=2),
+                target2
+            )
+        np.testing.assert_array_equal(
+            combine_fns.apply_and_concat_one_known_nb(
+                3, apply_func_nb, 3, 3, np.empty((9, 3), dtype=np.int_).T, df4.values, (10, 20, 30)),
+            target2
+        )
+        np.testing.assert_array_equal(
+            combine_fns.apply_and_concat_one_array(3, apply_func, 3, 1, np.int_, sr2.values, [10, 20, 30]),
+            target
+        )
+        np.testing.assert_array_equal(
+            combine_fns.apply_and_concat_one_array(3, apply_func, 3, 3, np.int_, df4.values, [10, 20, 30]),
+            target2
+        )
+        with pytest.raises(Exception):
+            combine_fns.apply_and_concat_one_known_nb(
+                3, apply_func_nb, 3, 3, np.empty((3, 3), dtype=np.int_), df4.values, (10, 20, 30))
+        assert combine_fns.apply_and_concat_one(3, apply_func, df4.values, [10, 20, 30]).flags['F_CONTIGUOUS']
+        out = np.empty((9, 3), dtype=np.float_).T
+        assert combine_fns.apply_and_concat_one(3, apply_func, df4.values, [10, 20, 30], out=out) is out
+        np.testing.assert_array_equal(out, target2)
+        with pytest.raises(Exception):
+            combine_fns.apply_and_concat_one(3, apply_func, df4.values, [10, 20, 30], out=np.empty((3, 3)))
+        with pytest.raises(Exception):
+            combine_fns.apply_and_concat_one(0, apply_func, df4.values, [10, 20, 30])
+        out = np.empty((3, 0))
+        assert combine_fns.apply_and_concat_one(0, apply_func, df4.values, [10, 20, 30], out=out) is out
+        with pytest.raises(Exception):
+            combine_fns.apply_and_concat_one(0, apply_func, df4.values, [10, 20, 30], out=np.empty((3, 3)))
+        assert combine_fns.apply_and_concat_one_nb(3, apply_func_nb, df4.values, (10, 20, 30)).flags['F_CONTIGUOUS']
+        assert combine_fns.apply_and_concat_one_nb(0, apply_func_nb, df4.values, (10, 20, 30)).shape == (3, 0)
+        assert combine_fns.apply_and_concat_one_par_nb(
+            0, apply_func_nb, df4.values, np.array([10, 20, 30])).shape == (3, 0)
+        # variable width
+        np.testing.assert_array_equal(
+            combine_fns.apply_and_concat_one(3, lambda i, x: x[:, :i + 1], df4.values),
+            np.array([
+                [1, 1, 2, 1, 2, 3],
+                [4, 4, 5, 4, 5, 6],
+                [7, 7, 8, 7, 8, 9]
+            ])
+        )
+
+    @pytest.mark.skipif(config.DISABLE_JIT, reason="C callbacks cannot be called with JIT disabled")
+    def test_apply_and_concat_one_cfunc(self):
+        @njit
+        def apply_func_nb(i, rows, cols, out_ptr, a):
+            out = farray(out_ptr, (rows, cols))
+            for c in range(cols):
+                for r in range(rows):
+                    out[r, c] = (r * cols + c + 1) + a * (i + 1)
+
+        apply_cfunc = combine_fns.compile_apply_cfunc(apply_func_nb, types.float64)
+        assert combine_fns.compile_apply_cfunc(apply_cfunc, types.float64) is apply_cfunc
+        np.testing.assert_array_equal(
+            combine_fns.apply_and_concat_one_cfunc_nb(3, apply_cfunc, 3, 3, np.empty((9, 3)).T, 10.),
+            np.array([
+                [11, 12, 13, 21, 22, 23, 31, 32, 33],
+                [14, 15, 16, 24, 25, 26, 34, 35, 36],
+                [17, 18, 19, 27, 28, 29, 37, 38, 39]
+            ])
+        )
+        with pytest.raises(Exception):
+            combine_fns.apply_and_concat_one_cfunc_nb(3, apply_cfunc, 3, 3, np.empty((3, 9)), 10.)
 
     def test_apply_and_concat_multiple(self):
         def apply_func(i, x, a):
@@ -2554,9 +2737,49 @@ class TestCombineFns:
         a, b = combine_fns.apply_and_concat_multiple(3, apply_func, df4.values, [10, 20, 30])
         np.testing.assert_array_equal(a, target_a)
         np.testing.assert_array_equal(b, target_b)
+        out = [np.empty((9, 3), dtype=np.int_).T, np.empty((9, 3), dtype=np.int_).T]
+        a, b = combine_fns.apply_and_concat_multiple(3, apply_func, df4.values, [10, 20, 30], out=out)
+        assert a is out[0]
+        assert b is out[1]
+        np.testing.assert_array_equal(a, target_a)
+        np.testing.assert_array_equal(b, target_b)
+        with pytest.raises(Exception):
+            combine_fns.apply_and_concat_multiple(3, apply_func, df4.values, [10, 20, 30], out=out[:1])
+        assert combine_fns.apply_and_concat_multiple(0, apply_func, df4.values, [10, 20, 30]) == []
+        out = [np.empty((3, 0)), np.empty((3, 0))]
+        a, b = combine_fns.apply_and_concat_multiple(0, apply_func, df4.values, [10, 20, 30], out=out)
+        assert a is out[0]
+        assert b is out[1]
+        with pytest.raises(Exception):
+            combine_fns.apply_and_concat_multiple(0, apply_func, df4.values, [10, 20, 30], out=[np.empty((3, 3))])
+        # variable width
+        a, b = combine_fns.apply_and_concat_multiple(3, lambda i, x: (x[:, :1], x[:, :i + 1]), df4.values)
+        np.testing.assert_array_equal(a, np.array([
+            [1, 1, 1],
+            [4, 4, 4],
+            [7, 7, 7]
+        ]))
+        np.testing.assert_array_equal(b, np.array([
+            [1, 1, 2, 1, 2, 3],
+            [4, 4, 5, 4, 5, 6],
+            [7, 7, 8, 7, 8, 9]
+        ]))
         a, b = combine_fns.apply_and_concat_multiple_nb(3, apply_func_nb, df4.values, (10, 20, 30))
         np.testing.assert_array_equal(a, target_a)
         np.testing.assert_array_equal(b, target_b)
+        a, b = combine_fns.apply_and_concat_multiple_par_nb(3, apply_func_nb, df4.values, np.array([10, 20, 30]))
+        np.testing.assert_array_equal(a, target_a)
+        np.testing.assert_array_equal(b, target_b)
+        a, b = combine_fns.apply_and_concat_multiple_nb(0, apply_func_nb, df4.values, (10, 20, 30))
+        assert a.shape == (3, 0)
+        assert b.shape == (3, 0)
+        a, b = combine_fns.apply_and_concat_multiple_par_nb(0, apply_func_nb, df4.values, np.array([10, 20, 30]))
+        assert a.shape == (3, 0)
+        assert b.shape == (3, 0)
+        if ray_available:
+            a, b = combine_fns.apply_and_concat_multiple_ray(3, apply_func, df4.values, [10, 20, 30], n_chunks=2)
+            np.testing.assert_array_equal(a, target_a)
+            np.testing.assert_array_equal(b, target_b)
 
     def test_combine_and_concat(self):
         def combine_func(x, y, a):
@@ -2598,6 +2821,17 @@ class TestCombineFns:
                 df4.values, (df4.values * 2, df4.values * 3), combine_func_nb, 100),
             target2
         )
+        # variable width
+        np.testing.assert_array_equal(
+            combine_fns.combine_and_concat(df4.values, (1, 2), lambda x, y: x[:, :y]),
+            np.array([
+                [1, 1, 2],
+                [4, 4, 5],
+                [7, 7, 8]
+            ])
+        )
+        with pytest.raises(Exception):
+            combine_fns.combine_and_concat(df4.values, (), combine_func, 100)
 
     def test_combine_multiple(self):
         def combine_func(x, y, a):
@@ -2619,6 +2853,16 @@ class TestCombineFns:
                 (sr2.values, sr2.values * 2, sr2.values * 3), combine_func_nb, 100),
             target
         )
+        np.testing.assert_array_equal(
+            combine_fns.combine_multiple(
+                (sr2.values, sr2.values * 2, sr2.values * 3), combine_func, 100, associative=True),
+            target
+        )
+        np.testing.assert_array_equal(
+            combine_fns.combine_multiple_tree_nb(
+                (sr2.values, sr2.values * 2, sr2.values * 3), combine_func_nb, 100),
+            target
+        )
         # 2d
         target2 = np.array([
             [206, 212, 218],
@@ -2635,6 +2879,57 @@ class TestCombineFns:
                 (df4.values, df4.values * 2, df4.values * 3), combine_func_nb, 100),
             target2
         )
+        np.testing.assert_array_equal(
+            combine_fns.combine_multiple(
+                (df4.values, df4.values * 2, df4.values * 3), combine_func, 100, associative=True),
+            target2
+        )
+        np.testing.assert_array_equal(
+            combine_fns.combine_multiple_tree_nb(
+                (df4.values, df4.values * 2, df4.values * 3), combine_func_nb, 100),
+            target2
+        )
+        # order is preserved
+        objs = tuple(np.array([i]) for i in range(5))
+        np.testing.assert_array_equal(
+            combine_fns.combine_multiple(objs, lambda x, y: np.concatenate((x, y)), associative=True),
+            np.arange(5)
+        )
+
+    def test_combine_multiple_inplace(self):
+        @njit
+        def combine_func_nb(x, y, a):
+            return x + y + a
+
+        @njit
+        def combine_func_inplace_nb(out, x, y, a):
+            out[:] = x + y + a
+
+        # 1d
+        objs = (sr2.values, sr2.values * 2, sr2.values * 3)
+        np.testing.assert_array_equal(
+            combine_fns.combine_multiple_inplace_nb(objs, combine_func_inplace_nb, 100),
+            np.array([206, 212, 218])
+        )
+        np.testing.assert_array_equal(
+            combine_fns.combine_multiple_inplace_nb(objs, combine_fns.make_combine_inplace_nb(np.add)),
+            np.array([6, 12, 18])
+        )
+        # 2d
+        objs = (df4.values, df4.values * 2, df4.values * 3)
+        np.testing.assert_array_equal(
+            combine_fns.combine_multiple_inplace_nb(objs, combine_fns.make_combine_inplace_nb(np.add)),
+            df4.values * 6
+        )
+        # inputs are not modified
+        np.testing.assert_array_equal(objs[0], df4.values)
+        assert combine_fns.make_combine_inplace_nb(np.add) is combine_fns.make_combine_inplace_nb(np.add)
+        with pytest.raises(Exception):
+            combine_fns.make_combine_inplace_nb(combine_func_nb)
+        with pytest.raises(Exception):
+            combine_fns.make_combine_inplace_nb(np.divmod)
+        with pytest.raises(Exception):
+            combine_fns.combine_multiple_inplace_nb(objs, combine_fns.make_combine_inplace_nb(np.add), 100)
 
 
 # ############# accessors.py ############# #
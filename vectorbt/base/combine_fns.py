@@ -6,137 +6,511 @@
 Combine functions combine two or more NumPy arrays using a custom function. The emphasis here is
 done upon stacking the results into one NumPy array - since vectorbt is all about brute-forcing
 large spaces of hyperparameters, concatenating the results of each hyperparameter combination into
-a single DataFrame is important. All functions are available in both Python and Numba-compiled form."""
+a single DataFrame is important. All functions are available in both Python and Numba-compiled form.
+
+!!! note
+    Numba-compiled functions that take another Numba-compiled function as an argument are not
+    cached to disk: Numba types such an argument by the identity of its dispatcher, thus a cache entry
+    written in one session can never be hit in another one."""
+
+import os
+from functools import lru_cache
 
 import numpy as np
-from numba import njit
-from tqdm.auto import tqdm
+from numba import njit, generated_jit, prange, cfunc, types, config
+from numba.core.ccallback import CFunc
+from numba.core.registry import CPUDispatcher
+from numba.typed import List
 
 from vectorbt import _typing as tp
 from vectorbt.base import reshape_fns
 
+_parallel_threshold = os.environ.get('VBT_PARALLEL_THRESHOLD', '').strip()
+if _parallel_threshold == '':
+    parallel_threshold = None
+else:
+    try:
+        parallel_threshold = int(_parallel_threshold)
+    except ValueError:
+        raise ValueError(f"Environment variable VBT_PARALLEL_THRESHOLD must be an integer, "
+                         f"not '{_parallel_threshold}'") from None
+"""Minimum number of iterations starting from which `apply_and_concat_none_nb`, `apply_and_concat_one_nb`
+and `apply_and_concat_multiple_nb` dispatch to their parallel versions.
+
+Read once from the environment variable `VBT_PARALLEL_THRESHOLD` at import time since Numba treats it
+as a compile-time constant. If None (default, or if the variable is empty), the parallel versions are never
+compiled nor used, and `apply_and_concat_none_nb`, `apply_and_concat_one_nb` and `apply_and_concat_multiple_nb`
+are bound directly to their sequential versions to avoid compiling an extra dispatching layer.
+
+!!! note
+    `vectorbt.indicators.factory.IndicatorFactory` always passes tuples (`args_before` and `input_tuple`)
+    to these functions, thus its Numba loop never takes the parallel path (see `can_parallelize`)."""
+
+
+def can_parallelize(args: tp.Any) -> bool:
+    """Whether a parallel version can be compiled for the Numba types of `*args`.
+
+    Numba cannot pass tuples to a parallel loop, thus `*args` must not contain any."""
+    if parallel_threshold is None:
+        return False
+    for arg in args.types:
+        if isinstance(arg, types.BaseTuple):
+            return False
+    return True
+
+
+def _progress_iter(iterable: tp.Iterable,
+                   show_progress: bool = False,
+                   tqdm_kwargs: tp.KwargsLike = None,
+                   total: tp.Optional[int] = None) -> tp.Iterable:
+    """Wrap `iterable` with `tqdm.auto.tqdm` if `show_progress` is True."""
+    if not show_progress:
+        return iterable
+    from tqdm.auto import tqdm
+
+    if tqdm_kwargs is None:
+        tqdm_kwargs = {}
+    if total is not None and 'total' not in tqdm_kwargs:
+        tqdm_kwargs = dict(tqdm_kwargs, total=total)
+    return tqdm(iterable, **tqdm_kwargs)
+
 
 def apply_and_concat_none(n: int,
                           apply_func: tp.Callable, *args,
                           show_progress: bool = False,
                           tqdm_kwargs: tp.KwargsLike = None,
+                          n_threads: tp.Optional[int] = None,
                           **kwargs) -> None:
     """For each value `i` from 0 to `n`, apply `apply_func` with arguments `*args` and `**kwargs`,
     and output nothing. Meant for in-place outputs.
 
-    `apply_func` must accept arguments `i`, `*args` and `**kwargs`."""
-    if tqdm_kwargs is None:
-        tqdm_kwargs = {}
-    for i in tqdm(range(n), disable=not show_progress, **tqdm_kwargs):
+    `apply_func` must accept arguments `i`, `*args` and `**kwargs`.
+
+    If `n_threads` is set and `apply_func` is Numba-compiled, runs the iterations in a thread pool
+    with `n_threads` workers. Otherwise, runs them sequentially.
+
+    !!! note
+        Threads only run concurrently if `apply_func` releases the GIL, that is, was compiled with `nogil=True`.
+        Each call of `apply_func` must write to its own part of the in-place outputs."""
+    if n_threads is not None and n_threads > 1 and isinstance(apply_func, CPUDispatcher):
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(n_threads) as executor:
+            iterator = executor.map(lambda i: apply_func(i, *args, **kwargs), range(n))
+            list(_progress_iter(iterator, show_progress, tqdm_kwargs, total=n))
+        return
+    iterator = _progress_iter(range(n), show_progress, tqdm_kwargs)
+    for i in iterator:
         apply_func(i, *args, **kwargs)
 
 
 @njit
+def apply_and_concat_none_seq_nb(n: int, apply_func_nb: tp.Callable, *args) -> None:
+    """Sequential version of `apply_and_concat_none_nb`."""
+    for i in range(n):
+        apply_func_nb(i, *args)
+
+
+@njit(parallel=True)
+def apply_and_concat_none_par_nb(n: int, apply_func_nb: tp.Callable, *args) -> None:
+    """Parallel version of `apply_and_concat_none_nb`.
+
+    !!! note
+        Each call of `apply_func_nb` must write to its own part of the in-place outputs."""
+    for i in prange(n):
+        apply_func_nb(i, *args)
+
+
+@generated_jit(nopython=True)
 def apply_and_concat_none_nb(n: int, apply_func_nb: tp.Callable, *args) -> None:
     """A Numba-compiled version of `apply_and_concat_none`.
 
+    Dispatches to `apply_and_concat_none_par_nb` if `n` reaches `parallel_threshold`
+    and `*args` can be passed to a parallel loop (see `can_parallelize`),
+    otherwise to `apply_and_concat_none_seq_nb`.
+
     !!! note
         * `apply_func_nb` must be Numba-compiled
         * `*args` must be Numba-compatible
         * No support for `**kwargs`
     """
-    for i in range(n):
-        apply_func_nb(i, *args)
+    nb_enabled = isinstance(n, types.Type)
+
+    if nb_enabled and can_parallelize(args[0]):
+        def _apply_and_concat_none_nb(n, apply_func_nb, *args):
+            if n >= parallel_threshold:
+                apply_and_concat_none_par_nb(n, apply_func_nb, *args)
+            else:
+                apply_and_concat_none_seq_nb(n, apply_func_nb, *args)
+    else:
+        def _apply_and_concat_none_nb(n, apply_func_nb, *args):
+            apply_and_concat_none_seq_nb(n, apply_func_nb, *args)
+
+    if not nb_enabled:
+        return _apply_and_concat_none_nb(n, apply_func_nb, *args)
+
+    return _apply_and_concat_none_nb
+
+
+if parallel_threshold is None:
+    apply_and_concat_none_nb = apply_and_concat_none_seq_nb
+
+
+def concat_one_results(results: tp.Iterable, n: int, out: tp.Optional[tp.Array2d] = None) -> tp.Array2d:
+    """Concat `n` results from `results` along axis 1.
+
+    Each result must be a single 1-dim or 2-dim array. Probes the shape using the first result,
+    allocates the output in column-major order, and writes each result into its own contiguous block.
+    If the shape or data type of a result changes, falls back to concatenation.
+
+    If `out` is provided, writes the results into it instead and returns it (see `apply_and_concat_one`)."""
+    if n == 0:
+        if out is not None:
+            if out.ndim != 2 or out.shape[1] != 0:
+                raise ValueError(f"out must be of shape (rows, 0), not {out.shape}")
+            return out
+        raise ValueError("Cannot concatenate zero results")
+    output = None
+    outputs = None
+    for i, output_i in enumerate(results):
+        if type(output_i) is not np.ndarray or output_i.ndim != 2:
+            output_i = reshape_fns.to_2d(output_i, raw=True)
+        if i == 0:
+            output_0 = output_i
+            output_shape = (output_0.shape[0], n * output_0.shape[1])
+            if out is not None:
+                if out.shape != output_shape:
+                    raise ValueError(f"out must be of shape {output_shape}, not {out.shape}")
+                output = out
+            else:
+                output = np.empty(output_shape, dtype=output_0.dtype, order='F')
+        if outputs is None:
+            if output_i.shape == output_0.shape and (out is not None or output_i.dtype == output_0.dtype):
+                output[:, i * output_i.shape[1]:(i + 1) * output_i.shape[1]] = output_i
+                continue
+            if out is not None:
+                raise ValueError("Cannot write into out: shape of the result has changed")
+            # Shape or data type has changed -> fall back to concatenation
+            outputs = [output[:, :i * output_0.shape[1]]]
+        outputs.append(output_i)
+    if outputs is not None:
+        return np.concatenate(outputs, axis=1)
+    return output
 
 
 def apply_and_concat_one(n: int,
                          apply_func: tp.Callable, *args,
                          show_progress: bool = False,
                          tqdm_kwargs: tp.KwargsLike = None,
+                         out: tp.Optional[tp.Array2d] = None,
                          **kwargs) -> tp.Array2d:
     """For each value `i` from 0 to `n`, apply `apply_func` with arguments `*args` and `**kwargs`,
     and concat the results along axis 1.
 
     The result of `apply_func` must be a single 1-dim or 2-dim array.
 
-    `apply_func` must accept arguments `i`, `*args` and `**kwargs`."""
-    if tqdm_kwargs is None:
-        tqdm_kwargs = {}
-    outputs = []
-    for i in tqdm(range(n), disable=not show_progress, **tqdm_kwargs):
-        outputs.append(reshape_fns.to_2d(apply_func(i, *args, **kwargs)))
-    return np.column_stack(outputs)
+    `apply_func` must accept arguments `i`, `*args` and `**kwargs`.
 
+    The output is allocated in column-major (Fortran) order, such that the result of each
+    `apply_func` call is written to a contiguous block and each column is a contiguous view.
 
-@njit
+    If `out` is provided, writes the results into it instead and returns it. It must be of shape
+    `(rows, n * cols)`, preferably in column-major order, such that it can be wrapped with
+    `pd.DataFrame(out, copy=False)` without copying. All results must then be of the same shape."""
+    iterator = _progress_iter(range(n), show_progress, tqdm_kwargs)
+    return concat_one_results((apply_func(i, *args, **kwargs) for i in iterator), n, out=out)
+
+
+def apply_and_concat_one_array(n: int,
+                               apply_func: tp.Callable,
+                               rows: int,
+                               cols: int,
+                               dtype: tp.DTypeLike, *args,
+                               **kwargs) -> tp.Array2d:
+    """Version of `apply_and_concat_one` for results of a known shape and data type.
+
+    Allocates a column-major array of shape `(rows, n * cols)` and data type `dtype` once, and writes
+    each result into it without any reshaping or validation. Recommended for sweeps over Numba-compiled
+    functions that return NumPy arrays, where `apply_and_concat_one` would only add Python overhead.
+
+    !!! note
+        * Each result of `apply_func` must be a NumPy array of shape `(rows, cols)`, or `(rows,)` if `cols` is 1
+        * No support for progress bars
+    """
+    out = np.empty((rows, n * cols), dtype=dtype, order='F')
+    for i in range(n):
+        output_i = apply_func(i, *args, **kwargs)
+        if output_i.ndim == 1:
+            out[:, i * cols] = output_i
+        else:
+            out[:, i * cols:(i + 1) * cols] = output_i
+    return out
+
+
+@generated_jit(nopython=True, cache=True)
 def to_2d_one_nb(a: tp.Array) -> tp.Array2d:
     """Expand the dimensions of array `a` along axis 1.
 
+    Specialized by the number of dimensions at compile time, such that each version is branch-free.
+
     !!! note
         * `a` must be strictly homogeneous"""
     if a.ndim > 1:
-        return a
-    return np.expand_dims(a, axis=1)
+        def _to_2d_one_nb(a):
+            return a
+    else:
+        def _to_2d_one_nb(a):
+            return np.expand_dims(a, axis=1)
+
+    if not isinstance(a, types.Type):
+        return _to_2d_one_nb(a)
+
+    return _to_2d_one_nb
 
 
 @njit
+def apply_and_concat_one_seq_nb(n: int, apply_func_nb: tp.Callable, *args) -> tp.Array2d:
+    """Sequential version of `apply_and_concat_one_nb`."""
+    output_0 = to_2d_one_nb(apply_func_nb(0, *args))
+    cols = output_0.shape[1]
+    output = np.empty((n * cols, output_0.shape[0]), dtype=output_0.dtype).T  # F-order
+    if n > 0:
+        output[:, :cols] = output_0
+    for i in range(1, n):
+        output[:, i * cols:(i + 1) * cols] = to_2d_one_nb(apply_func_nb(i, *args))
+    return output
+
+
+@njit(parallel=True)
+def apply_and_concat_one_par_nb(n: int, apply_func_nb: tp.Callable, *args) -> tp.Array2d:
+    """Parallel version of `apply_and_concat_one_nb`.
+
+    The shape is probed using the first output, such that each iteration writes to its own slab."""
+    output_0 = to_2d_one_nb(apply_func_nb(0, *args))
+    cols = output_0.shape[1]
+    output = np.empty((n * cols, output_0.shape[0]), dtype=output_0.dtype).T  # F-order
+    if n > 0:
+        output[:, :cols] = output_0
+    for i in prange(1, n):
+        output[:, i * cols:(i + 1) * cols] = to_2d_one_nb(apply_func_nb(i, *args))
+    return output
+
+
+@generated_jit(nopython=True)
 def apply_and_concat_one_nb(n: int, apply_func_nb: tp.Callable, *args) -> tp.Array2d:
     """A Numba-compiled version of `apply_and_concat_one`.
 
+    The output is also in column-major order.
+
+    Dispatches to `apply_and_concat_one_par_nb` if `n` reaches `parallel_threshold`
+    and `*args` can be passed to a parallel loop (see `can_parallelize`),
+    otherwise to `apply_and_concat_one_seq_nb`.
+
     !!! note
         * `apply_func_nb` must be Numba-compiled
         * `*args` must be Numba-compatible
         * No support for `**kwargs`
     """
-    output_0 = to_2d_one_nb(apply_func_nb(0, *args))
-    output = np.empty((output_0.shape[0], n * output_0.shape[1]), dtype=output_0.dtype)
+    nb_enabled = isinstance(n, types.Type)
+
+    if nb_enabled and can_parallelize(args[0]):
+        def _apply_and_concat_one_nb(n, apply_func_nb, *args):
+            if n >= parallel_threshold:
+                return apply_and_concat_one_par_nb(n, apply_func_nb, *args)
+            return apply_and_concat_one_seq_nb(n, apply_func_nb, *args)
+    else:
+        def _apply_and_concat_one_nb(n, apply_func_nb, *args):
+            return apply_and_concat_one_seq_nb(n, apply_func_nb, *args)
+
+    if not nb_enabled:
+        return _apply_and_concat_one_nb(n, apply_func_nb, *args)
+
+    return _apply_and_concat_one_nb
+
+
+if parallel_threshold is None:
+    apply_and_concat_one_nb = apply_and_concat_one_seq_nb
+
+
+@njit
+def apply_and_concat_one_known_nb(n: int, apply_func_nb: tp.Callable, rows: int, cols: int,
+                                  out: tp.Array2d, *args) -> tp.Array2d:
+    """Version of `apply_and_concat_one_nb` for callers that know the output shape in advance.
+
+    Writes the result of each `apply_func_nb` call into `out` and returns it.
+    No output of `apply_func_nb` is used to probe the shape.
+
+    !!! note
+        * `out` must be of shape `(rows, n * cols)`, preferably in column-major order
+        * Each output of `apply_func_nb` must be of shape `(rows, cols)` or `(rows,)` if `cols` is 1
+        * `apply_func_nb` must be Numba-compiled
+        * `*args` must be Numba-compatible
+        * No support for `**kwargs`
+    """
+    if out.shape[0] != rows or out.shape[1] != n * cols:
+        raise ValueError("out must be of shape (rows, n * cols)")
     for i in range(n):
-        if i == 0:
-            outputs_i = output_0
-        else:
-            outputs_i = to_2d_one_nb(apply_func_nb(i, *args))
-        output[:, i * outputs_i.shape[1]:(i + 1) * outputs_i.shape[1]] = outputs_i
-    return output
+        out[:, i * cols:(i + 1) * cols] = to_2d_one_nb(apply_func_nb(i, *args))
+    return out
+
+
+def apply_cfunc_sig(*arg_types, dtype: tp.Any = types.float64) -> tp.Any:
+    """Signature of a callback accepted by `apply_and_concat_one_cfunc_nb`.
+
+    The callback must accept the iteration `i`, the number of rows and columns of its block,
+    a pointer to the block in the output of data type `dtype`, and `*args` of types `arg_types`.
+    It must write the block in column-major order (for example, using `numba.farray`) and return nothing.
+
+    Since C callbacks cannot take arrays, `arg_types` can only include scalar and pointer types."""
+    return types.void(types.int64, types.int64, types.int64, types.CPointer(dtype), *arg_types)
+
+
+def compile_apply_cfunc(apply_func: tp.Callable, *arg_types, dtype: tp.Any = types.float64) -> CFunc:
+    """Compile `apply_func` with `numba.cfunc` using `apply_cfunc_sig`.
+
+    Returns `apply_func` if it's already compiled with `numba.cfunc`.
+    If it's compiled with `numba.njit`, compiles its Python function instead.
+
+    !!! note
+        Not supported with JIT disabled (`NUMBA_DISABLE_JIT=1`): the callback would receive
+        a raw pointer that cannot be wrapped into an array without compilation."""
+    if config.DISABLE_JIT:
+        raise ValueError("C callbacks are not supported with JIT disabled")
+    if isinstance(apply_func, CFunc):
+        return apply_func
+    if isinstance(apply_func, CPUDispatcher):
+        apply_func = apply_func.py_func
+    return cfunc(apply_cfunc_sig(*arg_types, dtype=dtype))(apply_func)
+
+
+@njit(cache=True)
+def apply_and_concat_one_cfunc_nb(n: int, apply_cfunc: tp.Callable, rows: int, cols: int,
+                                  out: tp.Array2d, *args) -> tp.Array2d:
+    """Version of `apply_and_concat_one_nb` that calls a C callback writing directly into `out`.
+
+    `apply_cfunc` must be compiled with `numba.cfunc` using `apply_cfunc_sig` (see `compile_apply_cfunc`).
+    Numba types it by its signature rather than by its identity, thus the call is a plain indirect call
+    and this function can be cached to disk.
+
+    !!! note
+        * The shape of each block must be known in advance
+        * `out` must be of shape `(rows, n * cols)` and in column-major order,
+            for example `np.empty((n * cols, rows)).T`
+        * `*args` must match the types in the signature of `apply_cfunc`
+        * Not supported with JIT disabled (see `compile_apply_cfunc`)
+
+    ## Example
+
+    ```python-repl
+    >>> from numba import farray
+    >>> from vectorbt.base.combine_fns import compile_apply_cfunc, apply_and_concat_one_cfunc_nb
+
+    >>> @compile_apply_cfunc
+    ... def apply_cfunc(i, rows, cols, out_ptr):
+    ...     out = farray(out_ptr, (rows, cols))
+    ...     out[:, :] = i
+
+    >>> apply_and_concat_one_cfunc_nb(3, apply_cfunc, 2, 1, np.empty((3, 2)).T)
+    array([[0., 1., 2.],
+           [0., 1., 2.]])
+    ```
+    """
+    if out.shape[0] != rows or out.shape[1] != n * cols:
+        raise ValueError("out must be of shape (rows, n * cols)")
+    if not out.flags.f_contiguous:
+        raise ValueError("out must be in column-major order")
+    for i in range(n):
+        apply_cfunc(i, rows, cols, out[:, i * cols:(i + 1) * cols].ctypes, *args)
+    return out
 
 
 def apply_and_concat_multiple(n: int,
                               apply_func: tp.Callable, *args,
                               show_progress: bool = False,
                               tqdm_kwargs: tp.KwargsLike = None,
+                              out: tp.Optional[tp.Sequence[tp.Array2d]] = None,
                               **kwargs) -> tp.List[tp.Array2d]:
     """Identical to `apply_and_concat_one`, except that the result of `apply_func` must be
     multiple 1-dim or 2-dim arrays. Each of these arrays at `i` will be concatenated with the
-    array at the same position at `i+1`."""
-    if tqdm_kwargs is None:
-        tqdm_kwargs = {}
-    outputs = []
-    for i in tqdm(range(n), disable=not show_progress, **tqdm_kwargs):
-        outputs.append(tuple(map(reshape_fns.to_2d, apply_func(i, *args, **kwargs))))
-    return list(map(np.column_stack, list(zip(*outputs))))
+    array at the same position at `i+1`. Each output is in column-major order.
+
+    If `out` is provided, it must contain one array per result.
+
+    Returns an empty list if `n` is 0 and `out` is not provided."""
+    if n == 0:
+        if out is not None:
+            for j in range(len(out)):
+                if out[j].ndim != 2 or out[j].shape[1] != 0:
+                    raise ValueError(f"out[{j}] must be of shape (rows, 0), not {out[j].shape}")
+            return list(out)
+        return []
+    iterator = _progress_iter(range(n), show_progress, tqdm_kwargs)
+    outputs = None
+    outputs_lst = None
+    for i in iterator:
+        outputs_i = tuple(
+            x if type(x) is np.ndarray and x.ndim == 2 else reshape_fns.to_2d(x, raw=True)
+            for x in apply_func(i, *args, **kwargs)
+        )
+        if i == 0:
+            outputs_0 = outputs_i
+            if out is not None:
+                if len(out) != len(outputs_0):
+                    raise ValueError(f"out must contain {len(outputs_0)} arrays, not {len(out)}")
+                outputs = list(out)
+            else:
+                outputs = [None] * len(outputs_0)
+            for j in range(len(outputs_0)):
+                output_shape = (outputs_0[j].shape[0], n * outputs_0[j].shape[1])
+                if out is not None:
+                    if outputs[j].shape != output_shape:
+                        raise ValueError(f"out[{j}] must be of shape {output_shape}, not {outputs[j].shape}")
+                else:
+                    outputs[j] = np.empty(output_shape, dtype=outputs_0[j].dtype, order='F')
+        if len(outputs_i) != len(outputs_0):
+            raise ValueError("Number of results has changed")
+        if outputs_lst is None:
+            if all(
+                    outputs_i[j].shape == outputs_0[j].shape and
+                    (out is not None or outputs_i[j].dtype == outputs_0[j].dtype)
+                    for j in range(len(outputs_i))):
+                for j in range(len(outputs_i)):
+                    outputs[j][:, i * outputs_i[j].shape[1]:(i + 1) * outputs_i[j].shape[1]] = outputs_i[j]
+                continue
+            if out is not None:
+                raise ValueError("Cannot write into out: shape of the results has changed")
+            # Shape or data type has changed -> fall back to concatenation
+            outputs_lst = [[outputs[j][:, :i * outputs_0[j].shape[1]]] for j in range(len(outputs_0))]
+        for j in range(len(outputs_i)):
+            outputs_lst[j].append(outputs_i[j])
+    if outputs_lst is not None:
+        return [np.concatenate(outputs_lst[j], axis=1) for j in range(len(outputs_lst))]
+    return outputs
 
 
-@njit
-def to_2d_multiple_nb(a: tp.Iterable[tp.Array]) -> tp.List[tp.Array2d]:
+@njit(cache=True)
+def to_2d_multiple_nb(a: tp.Iterable[tp.Array]) -> tp.NumbaList:
     """Expand the dimensions of each array in `a` along axis 1.
 
     !!! note
         * `a` must be strictly homogeneous
     """
-    lst = list()
+    lst = List()
     for _a in a:
         lst.append(to_2d_one_nb(_a))
     return lst
 
 
 @njit
-def apply_and_concat_multiple_nb(n: int, apply_func_nb: tp.Callable, *args) -> tp.List[tp.Array2d]:
-    """A Numba-compiled version of `apply_and_concat_multiple`.
-
-    !!! note
-        * Output of `apply_func_nb` must be strictly homogeneous
-        * `apply_func_nb` must be Numba-compiled
-        * `*args` must be Numba-compatible
-        * No support for `**kwargs`
-    """
-    outputs = list()
+def apply_and_concat_multiple_seq_nb(n: int, apply_func_nb: tp.Callable, *args) -> tp.NumbaList:
+    """Sequential version of `apply_and_concat_multiple_nb`."""
+    outputs = List()
     outputs_0 = to_2d_multiple_nb(apply_func_nb(0, *args))
     for j in range(len(outputs_0)):
-        outputs.append(np.empty((outputs_0[j].shape[0], n * outputs_0[j].shape[1]), dtype=outputs_0[j].dtype))
+        outputs.append(np.empty(
+            (n * outputs_0[j].shape[1], outputs_0[j].shape[0]),
+            dtype=outputs_0[j].dtype
+        ).T)  # F-order
     for i in range(n):
         if i == 0:
             outputs_i = outputs_0
@@ -147,6 +521,66 @@ def apply_and_concat_multiple_nb(n: int, apply_func_nb: tp.Callable, *args) -> t
     return outputs
 
 
+@njit(parallel=True)
+def apply_and_concat_multiple_par_nb(n: int, apply_func_nb: tp.Callable, *args) -> tp.NumbaList:
+    """Parallel version of `apply_and_concat_multiple_nb`.
+
+    The shapes are probed using the first outputs, such that each iteration writes to its own slabs."""
+    outputs = List()
+    outputs_0 = to_2d_multiple_nb(apply_func_nb(0, *args))
+    for j in range(len(outputs_0)):
+        outputs.append(np.empty(
+            (n * outputs_0[j].shape[1], outputs_0[j].shape[0]),
+            dtype=outputs_0[j].dtype
+        ).T)  # F-order
+        if n > 0:
+            outputs[j][:, :outputs_0[j].shape[1]] = outputs_0[j]
+    for i in prange(1, n):
+        outputs_i = to_2d_multiple_nb(apply_func_nb(i, *args))
+        for j in range(len(outputs_i)):
+            cols = outputs_0[j].shape[1]
+            outputs[j][:, i * cols:(i + 1) * cols] = outputs_i[j]
+    return outputs
+
+
+@generated_jit(nopython=True)
+def apply_and_concat_multiple_nb(n: int, apply_func_nb: tp.Callable, *args) -> tp.NumbaList:
+    """A Numba-compiled version of `apply_and_concat_multiple`.
+
+    Each output is also in column-major order. Outputs are returned as a typed list
+    (`numba.typed.List`) to avoid reflecting a Python list at each call boundary.
+
+    Dispatches to `apply_and_concat_multiple_par_nb` if `n` reaches `parallel_threshold`
+    and `*args` can be passed to a parallel loop (see `can_parallelize`),
+    otherwise to `apply_and_concat_multiple_seq_nb`.
+
+    !!! note
+        * Output of `apply_func_nb` must be strictly homogeneous
+        * `apply_func_nb` must be Numba-compiled
+        * `*args` must be Numba-compatible
+        * No support for `**kwargs`
+    """
+    nb_enabled = isinstance(n, types.Type)
+
+    if nb_enabled and can_parallelize(args[0]):
+        def _apply_and_concat_multiple_nb(n, apply_func_nb, *args):
+            if n >= parallel_threshold:
+                return apply_and_concat_multiple_par_nb(n, apply_func_nb, *args)
+            return apply_and_concat_multiple_seq_nb(n, apply_func_nb, *args)
+    else:
+        def _apply_and_concat_multiple_nb(n, apply_func_nb, *args):
+            return apply_and_concat_multiple_seq_nb(n, apply_func_nb, *args)
+
+    if not nb_enabled:
+        return _apply_and_concat_multiple_nb(n, apply_func_nb, *args)
+
+    return _apply_and_concat_multiple_nb
+
+
+if parallel_threshold is None:
+    apply_and_concat_multiple_nb = apply_and_concat_multiple_seq_nb
+
+
 def select_and_combine(i: int,
                        obj: tp.Any,
                        others: tp.Sequence,
@@ -159,14 +593,21 @@ def select_and_combine(i: int,
 def combine_and_concat(obj: tp.Any,
                        others: tp.Sequence,
                        combine_func: tp.Callable,
-                       *args, **kwargs) -> tp.Array2d:
-    """Use `apply_and_concat_one` to combine `obj` with each element from `others` using `combine_func`."""
-    return apply_and_concat_one(len(others), select_and_combine, obj, others, combine_func, *args, **kwargs)
+                       *args,
+                       show_progress: bool = False,
+                       tqdm_kwargs: tp.KwargsLike = None,
+                       **kwargs) -> tp.Array2d:
+    """Combine `obj` with each element from `others` using `combine_func` and concat the results along axis 1.
+
+    Identical to `apply_and_concat_one` with `select_and_combine`, but calls `combine_func` directly."""
+    n = len(others)
+    iterator = _progress_iter(range(n), show_progress, tqdm_kwargs)
+    return concat_one_results((combine_func(obj, others[i], *args, **kwargs) for i in iterator), n)
 
 
 @njit
-def select_and_combine_nb(i: int, obj: tp.Any, others: tp.Sequence, combine_func_nb: tp.Callable, *args) -> tp.Array:
-    """A Numba-compiled version of `select_and_combine`.
+def combine_and_concat_nb(obj: tp.Any, others: tp.Sequence, combine_func_nb: tp.Callable, *args) -> tp.Array2d:
+    """A Numba-compiled version of `combine_and_concat`.
 
     !!! note
         * `combine_func_nb` must be Numba-compiled
@@ -174,17 +615,32 @@ def select_and_combine_nb(i: int, obj: tp.Any, others: tp.Sequence, combine_func
         * `others` must be strictly homogeneous
         * No support for `**kwargs`
     """
-    return combine_func_nb(obj, others[i], *args)
-
-
-@njit
-def combine_and_concat_nb(obj: tp.Any, others: tp.Sequence, combine_func_nb: tp.Callable, *args) -> tp.Array2d:
-    """A Numba-compiled version of `combine_and_concat`."""
-    return apply_and_concat_one_nb(len(others), select_and_combine_nb, obj, others, combine_func_nb, *args)
+    output_0 = to_2d_one_nb(combine_func_nb(obj, others[0], *args))
+    cols = output_0.shape[1]
+    output = np.empty((len(others) * cols, output_0.shape[0]), dtype=output_0.dtype).T  # F-order
+    output[:, :cols] = output_0
+    for i in range(1, len(others)):
+        output[:, i * cols:(i + 1) * cols] = to_2d_one_nb(combine_func_nb(obj, others[i], *args))
+    return output
 
 
-def combine_multiple(objs: tp.Sequence, combine_func: tp.Callable, *args, **kwargs) -> tp.AnyArray:
-    """Combine `objs` pairwise into a single object."""
+def combine_multiple(objs: tp.Sequence, combine_func: tp.Callable, *args,
+                     associative: bool = False, **kwargs) -> tp.AnyArray:
+    """Combine `objs` pairwise into a single object.
+
+    If `associative` is True, combines adjacent objects level by level in a balanced tree
+    instead of folding them from left to right. The order of objects is preserved, thus
+    `combine_func` must only be associative, not commutative."""
+    if associative:
+        results = list(objs)
+        while len(results) > 1:
+            new_results = []
+            for i in range(0, len(results) - 1, 2):
+                new_results.append(combine_func(results[i], results[i + 1], *args, **kwargs))
+            if len(results) % 2 == 1:
+                new_results.append(results[-1])
+            results = new_results
+        return results[0]
     result = objs[0]
     for i in range(1, len(objs)):
         result = combine_func(result, objs[i], *args, **kwargs)
@@ -207,6 +663,74 @@ def combine_multiple_nb(objs: tp.Sequence, combine_func_nb: tp.Callable, *args)
     return result
 
 
+@njit
+def combine_multiple_tree_nb(objs: tp.Sequence, combine_func_nb: tp.Callable, *args) -> tp.Array:
+    """A Numba-compiled version of `combine_multiple` with `associative=True`.
+
+    !!! note
+        * `combine_func_nb` must be Numba-compiled and associative
+        * `objs` and `*args` must be Numba-compatible
+        * `objs` must be strictly homogeneous
+        * Output of `combine_func_nb` must be of the same type as `objs`
+        * No support for `**kwargs`
+    """
+    results = list()
+    for i in range(len(objs)):
+        results.append(objs[i])
+    while len(results) > 1:
+        new_results = list()
+        for i in range(0, len(results) - 1, 2):
+            new_results.append(combine_func_nb(results[i], results[i + 1], *args))
+        if len(results) % 2 == 1:
+            new_results.append(results[-1])
+        results = new_results
+    return results[0]
+
+
+@njit
+def combine_multiple_inplace_nb(objs: tp.Sequence, combine_func_inplace_nb: tp.Callable, *args) -> tp.Array:
+    """A Numba-compiled version of `combine_multiple` that writes each step into a single buffer.
+
+    `combine_func_inplace_nb` must accept arguments `out`, `a`, `b` and `*args`, and write
+    the combination of `a` and `b` into `out`. It is called with `out` being also `a`, thus
+    it must be safe to use with aliased arrays (such as element-wise operations).
+    See `make_combine_inplace_nb` for generating one from a binary NumPy ufunc.
+
+    !!! note
+        * `combine_func_inplace_nb` must be Numba-compiled
+        * `objs` and `*args` must be Numba-compatible
+        * `objs` must be strictly homogeneous
+        * No support for `**kwargs`
+    """
+    out = np.empty_like(objs[0])
+    out[:] = objs[0]
+    for i in range(1, len(objs)):
+        combine_func_inplace_nb(out, out, objs[i], *args)
+    return out
+
+
+@lru_cache(maxsize=None)
+def make_combine_inplace_nb(combine_func: np.ufunc) -> tp.Callable:
+    """Generate a Numba-compiled in-place version of a binary NumPy ufunc for `combine_multiple_inplace_nb`.
+
+    `combine_func` must be a binary ufunc with a single output such as `np.add` or `np.logical_and`.
+    The result is written directly into `out` without allocating, and cast to the data type of `out`
+    as per the ufunc's rules. The generated function accepts no additional arguments.
+
+    The generated function is memoized per ufunc, such that neither it nor `combine_multiple_inplace_nb`
+    is recompiled on each call."""
+    if not isinstance(combine_func, np.ufunc) or combine_func.nin != 2 or combine_func.nout != 1:
+        raise TypeError(f"combine_func must be a binary NumPy ufunc with a single output, not {combine_func}")
+
+    @njit
+    def combine_func_inplace_nb(out, a, b, *args):
+        if len(args) > 0:
+            raise TypeError("Function generated from a ufunc accepts no additional arguments")
+        combine_func(a, b, out)
+
+    return combine_func_inplace_nb
+
+
 def ray_apply(n: int,
               apply_func: tp.Callable, *args,
               ray_force_init: bool = False,
@@ -250,16 +774,74 @@ def ray_apply(n: int,
     return results
 
 
-def apply_and_concat_one_ray(*args, **kwargs) -> tp.Array2d:
-    """Distributed version of `apply_and_concat_one`."""
-    results = ray_apply(*args, **kwargs)
-    return np.column_stack(list(map(reshape_fns.to_2d, results)))
+def apply_chunk(i: int,
+                chunks: tp.Sequence[tp.Tuple[int, int]],
+                apply_and_concat_func: tp.Callable,
+                apply_func: tp.Callable,
+                *args, **kwargs) -> tp.Any:
+    """Apply `apply_and_concat_func` to the iterations of the chunk at `i` in `chunks`.
+
+    Each chunk is a tuple of start (inclusive) and stop (exclusive) iteration.
+    `apply_func` receives the global iteration, not the iteration within the chunk."""
+    start, stop = chunks[i]
+
+    def _apply_func(j, *_args, **_kwargs):
+        return apply_func(start + j, *_args, **_kwargs)
+
+    return apply_and_concat_func(stop - start, _apply_func, *args, **kwargs)
+
+
+def ray_apply_chunked(n: int,
+                      apply_and_concat_func: tp.Callable,
+                      apply_func: tp.Callable, *args,
+                      n_chunks: tp.Optional[int] = None,
+                      ray_force_init: bool = False,
+                      ray_init_kwargs: tp.KwargsLike = None,
+                      **kwargs) -> tp.List[tp.Any]:
+    """Split `n` iterations into `n_chunks` contiguous chunks and run `apply_chunk` on each chunk
+    in distributed manner using `ray_apply`.
+
+    Each task concatenates the results of its chunk using `apply_and_concat_func` and returns them at once,
+    which reduces the scheduling and object store overhead compared to one task per iteration.
+    If `n_chunks` is None, uses the number of CPUs available to Ray.
+
+    Other keyword arguments are passed to `ray_apply`."""
+    import ray
+
+    if ray_init_kwargs is None:
+        ray_init_kwargs = {}
+    if ray_force_init:
+        if ray.is_initialized():
+            ray.shutdown()
+    if not ray.is_initialized():
+        ray.init(**ray_init_kwargs)
+    if n_chunks is None:
+        n_chunks = int(ray.available_resources().get('CPU', 1))
+    n_chunks = max(min(n_chunks, n), 1)
+    chunk_size, remainder = divmod(n, n_chunks)
+    chunks = []
+    start = 0
+    for c in range(n_chunks):
+        stop = start + chunk_size + (1 if c < remainder else 0)
+        chunks.append((start, stop))
+        start = stop
+    return ray_apply(n_chunks, apply_chunk, chunks, apply_and_concat_func, apply_func, *args, **kwargs)
+
+
+def apply_and_concat_one_ray(n: int, apply_func: tp.Callable, *args, **kwargs) -> tp.Array2d:
+    """Distributed version of `apply_and_concat_one`.
+
+    Uses `ray_apply_chunked`, thus each task runs `apply_and_concat_one` on a chunk of iterations."""
+    results = ray_apply_chunked(n, apply_and_concat_one, apply_func, *args, **kwargs)
+    return np.concatenate(results, axis=1)
+
 
+def apply_and_concat_multiple_ray(n: int, apply_func: tp.Callable, *args, **kwargs) -> tp.List[tp.Array2d]:
+    """Distributed version of `apply_and_concat_multiple`.
 
-def apply_and_concat_multiple_ray(*args, **kwargs) -> tp.List[tp.Array2d]:
-    """Distributed version of `apply_and_concat_multiple`."""
-    results = ray_apply(*args, **kwargs)
-    return list(map(np.column_stack, list(zip(*results))))
+    Uses `ray_apply_chunked`, thus each task runs `apply_and_concat_multiple` on a chunk of iterations."""
+    results = ray_apply_chunked(n, apply_and_concat_multiple, apply_func, *args, **kwargs)
+    return [np.concatenate(outputs, axis=1) for outputs in zip(*results)]
 
 
 def combine_and_concat_ray(obj: tp.Any,
@@ -569,9 +569,9 @@ class SignalFactory(IndicatorFactory):
             apply_func = scope['apply_func']
             if numba_loop:
                 apply_func = njit(apply_func)
-                apply_and_concat_func = combine_fns.apply_and_concat_one_nb
+                apply_and_concat_func = combine_fns.apply_and_concat_one_known_nb
             else:
-                apply_and_concat_func = combine_fns.apply_and_concat_one
+                apply_and_concat_func = combine_fns.apply_and_concat_one_array
 
         elif mode == FactoryMode.Exits:
             _0 = "i"
@@ -609,9 +609,9 @@ class SignalFactory(IndicatorFactory):
             apply_func = scope['apply_func']
             if numba_loop:
                 apply_func = njit(apply_func)
-                apply_and_concat_func = combine_fns.apply_and_concat_one_nb
+                apply_and_concat_func = combine_fns.apply_and_concat_one_known_nb
             else:
-                apply_and_concat_func = combine_fns.apply_and_concat_one
+                apply_and_concat_func = combine_fns.apply_and_concat_one_array
 
         else:
             _0 = "i"
@@ -853,9 +853,7 @@ class SignalFactory(IndicatorFactory):
                 else:
                     _entry_param_tuples = ()
 
-                return apply_and_concat_func(
-                    n_params,
-                    apply_func,
+                func_args = (
                     input_shape,
                     entry_pick_first,
                     entry_input_tuple,
@@ -863,6 +861,13 @@ class SignalFactory(IndicatorFactory):
                     *_entry_param_tuples,
                     entry_args + entry_more_args + entry_cache
                 )
+                # Output shape and data type are known in advance
+                rows = input_shape[0]
+                cols = input_shape[1] if len(input_shape) > 1 else 1
+                if numba_loop:
+                    out = np.empty((n_params * cols, rows), dtype=np.bool_).T
+                    return apply_and_concat_func(n_params, apply_func, rows, cols, out, *func_args)
+                return apply_and_concat_func(n_params, apply_func, rows, cols, np.bool_, *func_args)
 
             elif mode == FactoryMode.Exits:
                 if len(exit_in_output_names) > 0:
@@ -880,9 +885,7 @@ class SignalFactory(IndicatorFactory):
                 else:
                     _exit_param_tuples = ()
 
-                return apply_and_concat_func(
-                    n_params,
-                    apply_func,
+                func_args = (
                     input_list[0],
                     exit_wait,
                     until_next,
@@ -893,6 +896,13 @@ class SignalFactory(IndicatorFactory):
                     *_exit_param_tuples,
                     exit_args + exit_more_args + exit_cache
                 )
+                # Output shape and data type are known in advance
+                rows = input_list[0].shape[0]
+                cols = input_list[0].shape[1] if input_list[0].ndim > 1 else 1
+                if numba_loop:
+                    out = np.empty((n_params * cols, rows), dtype=np.bool_).T
+                    return apply_and_concat_func(n_params, apply_func, rows, cols, out, *func_args)
+                return apply_and_concat_func(n_params, apply_func, rows, cols, np.bool_, *func_args)
 
             else:
                 if len(entry_in_output_names) > 0: